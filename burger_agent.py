@@ -1,10 +1,14 @@
+import asyncio
+import difflib
 import os
 from dotenv import load_dotenv
-from langchain.agents import create_agent
 from langchain.tools import tool
-from langchain_community.vectorstores import FAISS
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langfuse import get_client
+from langgraph.prebuilt import create_react_agent
 from langfuse.langchain import CallbackHandler
 
 load_dotenv()
@@ -13,34 +17,11 @@ if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY not found in environment variables. Please set it in your .env file.")
 os.environ["GOOGLE_API_KEY"] = gemini_api_key
 
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-
-MENU_DATA = [
-    "Big Mac: $5",
-    "Whopper: $6", 
-    "Fries: $2",
-]
-
-vectorstore = FAISS.from_texts(texts=MENU_DATA, embedding=embeddings)
-retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-
-
-@tool
-def lookup_price(query: str) -> str:
-    """
-    Search the menu database for item prices.
-    Use this tool when the user asks about menu items or prices.
-    
-    Args:
-        query: The search query for menu items (e.g., "Big Mac price")
-    
-    Returns:
-        Relevant menu items and their prices
-    """
-    docs = retriever.invoke(query)
-    if not docs:
-        return "No items found matching your query."
-    return "\n".join([doc.page_content for doc in docs])
+MENU = {
+    "Big Mac": 5,
+    "Whopper": 6,
+    "Fries": 2,
+}
 
 
 @tool
@@ -58,56 +39,169 @@ def place_order(items: str) -> str:
     return f"ORDER_PLACED: [{items}]"
 
 
-tools = [lookup_price, place_order]
+tools = [place_order]
+
+# Hand-declared function spec for the model binding. The schema is a static
+# single-string param, so passing ready-made JSON lets LangChain skip its
+# convert_to_openai_function/Pydantic introspection path when binding tools.
+# The @tool-decorated function above stays registered for tool execution.
+PLACE_ORDER_SPEC = {
+    "name": "place_order",
+    "description": (
+        "Place an order for the specified items. "
+        "Use this tool when the user wants to order items from the menu."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "string",
+                "description": 'Comma-separated list of items to order (e.g., "Big Mac, Fries")',
+            },
+        },
+        "required": ["items"],
+    },
+}
+
+# Cache LLM responses on disk: with temperature=0, repeated identical prompts
+# (common across the test suites) can skip the Gemini call entirely.
+# Disable with BURGER_LLM_CACHE=0 or `pytest --no-llm-cache`.
+if os.getenv("BURGER_LLM_CACHE", "1") != "0":
+    set_llm_cache(SQLiteCache(database_path=".burger_llm_cache.db"))
 
 llm = ChatGoogleGenerativeAI(
     model="gemini-2.0-flash",
     temperature=0,
 )
 
-system_prompt = """You are a helpful burger shop assistant. Your job is to:
-1. Help customers find menu items and prices using the lookup_price tool
+# The menu is tiny and static, so compile it straight into the system prompt:
+# price questions are answered from context without a lookup tool roundtrip.
+menu_str = "\n".join(f"- {item}: ${price}" for item, price in MENU.items())
+
+system_prompt = f"""You are a helpful burger shop assistant. Your job is to:
+1. Help customers find menu items and prices using the menu below
 2. Place orders for customers using the place_order tool
 
-Always be friendly and helpful. When a customer asks about prices, use the lookup_price tool first.
-When they want to order, use the place_order tool with the items they requested.
+Current menu:
+{menu_str}
+
+Always be friendly and helpful. When a customer asks about prices, answer directly from
+the menu above. When they want to order, use the place_order tool with the items they
+requested — if they also asked about prices, answer those in the same turn.
 
-Important: Always look up prices before confirming them to customers."""
+Important: Only quote prices that appear on the menu above."""
 
-agent = create_agent(
-    model=llm,
-    tools=tools,
-    system_prompt=system_prompt,
-    debug=False,
+# Bind the prebuilt JSON spec to the model; the plain tools list still backs
+# the agent's tool node so the calls execute against the Python function.
+agent = create_react_agent(
+    llm.bind_tools([PLACE_ORDER_SPEC]),
+    tools,
+    prompt=system_prompt,
 )
 
+# Single handler shared across all invocations: constructing a CallbackHandler
+# per call re-initializes Langfuse client wiring on every request.
+langfuse_client = get_client()
+langfuse_handler = CallbackHandler()
 
-def run_agent(user_input: str) -> tuple[str, str | None]:
+# Optional response cache for near-identical queries: repeats that differ only
+# in case/whitespace (via normalization) or minor wording such as punctuation
+# ("How much is a Big Mac?" vs "How much is a Big Mac") reuse the cached
+# response without an agent run. True paraphrases ("Big Mac price?") score far
+# below the 0.95 difflib cutoff and will miss — by design, since looser
+# matching would return stale answers for genuinely different questions.
+# Opt-in via BURGER_SEMANTIC_CACHE=1 since even near-matches can mask regressions.
+_SEMANTIC_CACHE_ENABLED = os.getenv("BURGER_SEMANTIC_CACHE") == "1"
+_SEMANTIC_CACHE_CUTOFF = 0.95
+_semantic_cache: dict[str, str] = {}
+
+
+def _normalize_query(user_input: str) -> str:
+    return " ".join(user_input.lower().split())
+
+
+def _semantic_cache_get(user_input: str) -> str | None:
+    """Return a cached response for a near-identical earlier query, if any."""
+    key = _normalize_query(user_input)
+    if key in _semantic_cache:
+        return _semantic_cache[key]
+    close = difflib.get_close_matches(key, _semantic_cache, n=1, cutoff=_SEMANTIC_CACHE_CUTOFF)
+    return _semantic_cache[close[0]] if close else None
+
+
+async def arun_agent(user_input: str) -> tuple[str, str | None]:
     """
-    Run the burger shop agent with the given user input.
+    Run the burger shop agent asynchronously with the given user input.
     Includes Langfuse observability via callback handler.
-    
+
     Args:
         user_input: The customer's message/query
-        
+
     Returns:
         Tuple of (agent_response, trace_id)
     """
-    langfuse_handler = CallbackHandler()
+    if _SEMANTIC_CACHE_ENABLED:
+        cached = _semantic_cache_get(user_input)
+        if cached is not None:
+            return (cached, None)
+
     inputs = {"messages": [HumanMessage(content=user_input)]}
     config = {"callbacks": [langfuse_handler]}
-    result = agent.invoke(inputs, config=config)
-    trace_id = getattr(langfuse_handler, 'last_trace_id', None)
-    
+    with langfuse_client.start_as_current_span(name="burger-agent"):
+        result = await agent.ainvoke(inputs, config=config)
+        trace_id = langfuse_client.get_current_trace_id()
+
     messages = result.get("messages", [])
-    if messages:
-        for msg in reversed(messages):
-            if isinstance(msg, AIMessage) and msg.content:
-                return (str(msg.content), trace_id)
-            elif hasattr(msg, "content") and msg.content and not isinstance(msg, HumanMessage):
-                return (str(msg.content), trace_id)
-    
-    return (str(result), trace_id)
+    msg = next(
+        (m for m in reversed(messages) if isinstance(m, AIMessage) and m.content),
+        None,
+    )
+    response = str(msg.content) if msg else str(result)
+
+    if _SEMANTIC_CACHE_ENABLED:
+        _semantic_cache[_normalize_query(user_input)] = response
+
+    return (response, trace_id)
+
+
+async def astream_agent(user_input: str, stop_when=None) -> tuple[str, str | None]:
+    """
+    Stream the agent's response, optionally cancelling early.
+
+    Args:
+        user_input: The customer's message/query
+        stop_when: Optional predicate over the accumulated response text;
+            once it returns True the stream is abandoned and the partial
+            response returned. Useful for tests that only need to see a
+            target substring (e.g. "$5" or "ORDER_PLACED").
+
+    Returns:
+        Tuple of (agent_response, trace_id)
+    """
+    inputs = {"messages": [HumanMessage(content=user_input)]}
+    config = {"callbacks": [langfuse_handler]}
+    chunks: list[str] = []
+    with langfuse_client.start_as_current_span(name="burger-agent"):
+        trace_id = langfuse_client.get_current_trace_id()
+        async for chunk, _ in agent.astream(inputs, config=config, stream_mode="messages"):
+            if isinstance(chunk, AIMessage) and chunk.content:
+                chunks.append(str(chunk.content))
+                if stop_when and stop_when("".join(chunks)):
+                    break
+    return ("".join(chunks), trace_id)
+
+
+def run_agent(user_input: str) -> tuple[str, str | None]:
+    """
+    Synchronous wrapper around arun_agent for callers without an event loop.
+
+    Args:
+        user_input: The customer's message/query
+
+    Returns:
+        Tuple of (agent_response, trace_id)
+    """
+    return asyncio.run(arun_agent(user_input))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-llm-cache",
+        action="store_true",
+        default=False,
+        help="Disable the on-disk LLM response cache for this run.",
+    )
+
+
+def pytest_configure(config):
+    # Must run before burger_agent is imported by the test modules.
+    if config.getoption("--no-llm-cache"):
+        os.environ["BURGER_LLM_CACHE"] = "0"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_agent():
+    """
+    Pay the agent's one-time setup cost (module import, tool schema
+    generation, graph construction) before the first test instead of
+    charging it to whichever test happens to run first. Touching the
+    graph forces any remaining lazy initialization without an LLM call.
+    """
+    from burger_agent import agent
+
+    agent.get_graph()